@@ -1,6 +1,383 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from math import exp
+
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import interp1d
+from matplotlib.figure import Figure
+from numba import njit, prange, types
+from numba.extending import overload
+
+# Durata massima simulata (s)
+MAX_FLIGHT_TIME = 300.0
+
+# Colonne della traiettoria restituita da simulate() in results['traj']
+COL_T, COL_H, COL_V = 0, 1, 2
+
+# Inverso dell'altezza di scala dell'atmosfera esponenziale (1/m)
+INV_SCALE_HEIGHT = 1.0 / 8500.0
+
+# Tableau di Dormand-Prince 5(4): nodi, coefficienti, pesi del 5° ordine
+# e differenza tra i pesi del 5° e del 4° ordine (stima dell'errore)
+_DP_C = np.array([0.0, 1/5, 3/10, 4/5, 8/9, 1.0])
+_DP_A = np.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0],
+    [1/5, 0.0, 0.0, 0.0, 0.0],
+    [3/40, 9/40, 0.0, 0.0, 0.0],
+    [44/45, -56/15, 32/9, 0.0, 0.0],
+    [19372/6561, -25360/2187, 64448/6561, -212/729, 0.0],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+])
+_DP_B = np.array([35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84])
+_DP_E = np.array([71/57600, 0.0, -71/16695, 71/1920, -17253/339200,
+                  22/525, -1/40])
+
+
+def _thrust_at(t, thrust_data):
+    """Spinta al tempo t durante la combustione.
+    
+    thrust_data è la spinta costante (float) oppure la curva
+    (t_arr, thr_arr); la variante viene scelta in compilazione dal tipo.
+    """
+
+
+@overload(_thrust_at)
+def _thrust_at_impl(t, thrust_data):
+    if isinstance(thrust_data, types.Float):
+        return lambda t, thrust_data: thrust_data
+    
+    def curve(t, thrust_data):
+        t_arr, thr_arr = thrust_data
+        if t < t_arr[0] or t > t_arr[-1]:
+            return 0.0
+        return np.interp(t, t_arr, thr_arr)
+    return curve
+
+
+@njit(cache=True)
+def _thrust_mass(t, thrust_data, burn_time, m0, mdot, mf):
+    """Spinta e massa al tempo t"""
+    if t > burn_time:
+        return 0.0, mf
+    return _thrust_at(t, thrust_data), m0 - mdot * t
+
+
+@njit(cache=True)
+def _acceleration(thrust_force, m, v, h, g, rho, drag_k):
+    """Accelerazione verticale dovuta a spinta, peso e resistenza"""
+    # v*|v| mantiene il segno: la resistenza si oppone sempre al moto
+    drag = rho * exp(-h * INV_SCALE_HEIGHT) * v * abs(v) * drag_k
+    return (thrust_force - m * g - drag) / m
+
+
+@njit(cache=True)
+def _hermite(w, dt, h0, v0, h1, v1):
+    """Interpolante cubico di Hermite del passo: (h, v) alla frazione w"""
+    w2 = w * w
+    w3 = w2 * w
+    h = ((2.0 * w3 - 3.0 * w2 + 1.0) * h0 + (w3 - 2.0 * w2 + w) * dt * v0
+         + (3.0 * w2 - 2.0 * w3) * h1 + (w3 - w2) * dt * v1)
+    v = ((6.0 * w2 - 6.0 * w) * (h0 - h1) / dt
+         + (3.0 * w2 - 4.0 * w + 1.0) * v0 + (3.0 * w2 - 2.0 * w) * v1)
+    return h, v
+
+
+@njit(cache=True)
+def _event_fraction(dt, h0, v0, h1, v1, col, level):
+    """Frazione del passo in cui h (col=COL_H) o v (col=COL_V) vale level.
+    
+    Bisezione sull'interpolante di Hermite; il valore deve attraversare
+    level all'interno del passo.
+    """
+    below = (h0 if col == COL_H else v0) < level
+    lo = 0.0
+    hi = 1.0
+    for _ in range(50):
+        mid = 0.5 * (lo + hi)
+        h, v = _hermite(mid, dt, h0, v0, h1, v1)
+        if ((h if col == COL_H else v) < level) == below:
+            lo = mid
+        else:
+            hi = mid
+    return 0.5 * (lo + hi)
+
+
+@njit(cache=True)
+def _store(traj, n, t, h, v):
+    """Aggiunge il campione (t, h, v) alla traiettoria, ingrandendola se piena"""
+    if n == traj.shape[0]:
+        grown = np.empty((2 * n, 3))
+        grown[:n] = traj
+        traj = grown
+    traj[n, COL_T] = t
+    traj[n, COL_H] = h
+    traj[n, COL_V] = v
+    return traj, n + 1
+
+
+@njit(cache=True)
+def _integrate(thrust_data, burn_time, m0, mdot, mf, g, rho, drag_k,
+               rtol, atol, max_step, max_t, store_dt, record):
+    """Integra la fase ascendente (Dormand-Prince 5(4) a passo adattivo).
+    
+    La spinta è data da _thrust_at(t, thrust_data) e vale 0 dopo
+    burn_time; il passo è limitato a max_step e viene
+    accorciato per cadere esattamente sullo spegnimento del motore.
+    Nella traiettoria si salva al più un campione ogni store_dt secondi,
+    più i punti esatti di uscita rampa e apogeo.
+    Restituisce la traiettoria (N, 3) già troncata, con colonne
+    (t, h, v), e apogeo, tempo all'apogeo, velocità e tempo a 2m.
+    Con record=False la traiettoria non viene salvata (traiettoria vuota).
+    """
+    traj = np.empty((1024 if record else 1, 3))
+    kh = np.empty(7)
+    kv = np.empty(7)
+    
+    t = 0.0
+    h = 0.0
+    v = 0.0
+    
+    apogee = 0.0
+    time_to_apogee = 0.0
+    v_at_2m = 0.0
+    t_at_2m = 0.0
+    reached_2m = False
+    
+    thrust_force, m = _thrust_mass(t, thrust_data, burn_time,
+                                   m0, mdot, mf)
+    traj[0, COL_T] = t
+    traj[0, COL_H] = h
+    traj[0, COL_V] = v
+    n = 1
+    
+    # Primo stadio (FSAL: viene riusato dall'ultimo stadio del passo prima)
+    kh[0] = v
+    kv[0] = _acceleration(thrust_force, m, v, h, g, rho, drag_k)
+    
+    dt = min(1e-3, max_step)
+    err_prev = 1e-4
+    while True:
+        dt = min(dt, max_step)
+        to_burnout = t < burn_time < t + dt
+        if to_burnout:
+            dt = burn_time - t
+        
+        # Stadi intermedi
+        for s in range(1, 6):
+            hs = h
+            vs = v
+            for j in range(s):
+                hs += dt * _DP_A[s, j] * kh[j]
+                vs += dt * _DP_A[s, j] * kv[j]
+            thr_s, m_s = _thrust_mass(t + _DP_C[s] * dt, thrust_data,
+                                      burn_time, m0, mdot, mf)
+            kh[s] = vs
+            kv[s] = _acceleration(thr_s, m_s, vs, hs, g, rho, drag_k)
+        
+        # Soluzione del 5° ordine e ultimo stadio in t + dt
+        h_new = h
+        v_new = v
+        for j in range(6):
+            h_new += dt * _DP_B[j] * kh[j]
+            v_new += dt * _DP_B[j] * kv[j]
+        t_new = burn_time if to_burnout else t + dt
+        thr_new, m_new = _thrust_mass(t_new, thrust_data, burn_time,
+                                      m0, mdot, mf)
+        kh[6] = v_new
+        kv[6] = _acceleration(thr_new, m_new, v_new, h_new, g, rho, drag_k)
+        
+        # Errore locale in norma RMS pesata
+        err_h = 0.0
+        err_v = 0.0
+        for j in range(7):
+            err_h += dt * _DP_E[j] * kh[j]
+            err_v += dt * _DP_E[j] * kv[j]
+        err_h /= atol + rtol * max(abs(h), abs(h_new))
+        err_v /= atol + rtol * max(abs(v), abs(v_new))
+        err = np.sqrt(0.5 * (err_h * err_h + err_v * err_v))
+        
+        if err > 1.0:
+            # Passo rifiutato: si riduce e si ripete
+            dt *= max(0.2, 0.9 * err ** -0.2)
+            continue
+        
+        # Passo accettato: controllore PI per il passo successivo
+        err = max(err, 1e-10)
+        dt *= min(10.0, max(0.2, 0.9 * err ** -0.17 * err_prev ** 0.04))
+        err_prev = max(err, 1e-4)
+        
+        t_old = t
+        h_old = h
+        v_old = v
+        t = t_new
+        h = h_new
+        v = v_new
+        kh[0] = kh[6]
+        if to_burnout:
+            # FSAL non valido sullo spegnimento: kv[6] include ancora la
+            # spinta, il passo successivo parte a motore spento
+            kv[0] = _acceleration(0.0, mf, v, h, g, rho, drag_k)
+        else:
+            kv[0] = kv[6]
+        
+        # Eventi: radice dell'interpolante di Hermite nel passo appena fatto
+        step = t - t_old
+        if not reached_2m and h >= 2.0:
+            reached_2m = True
+            w = _event_fraction(step, h_old, v_old, h, v, COL_H, 2.0)
+            _, v_at_2m = _hermite(w, step, h_old, v_old, h, v)
+            t_at_2m = t_old + w * step
+            if record:
+                traj, n = _store(traj, n, t_at_2m, 2.0, v_at_2m)
+        
+        # Apogeo: cambio di segno della velocità
+        if v <= 0.0 < v_old:
+            w = _event_fraction(step, h_old, v_old, h, v, COL_V, 0.0)
+            apogee, _ = _hermite(w, step, h_old, v_old, h, v)
+            time_to_apogee = t_old + w * step
+            if record:
+                traj, n = _store(traj, n, time_to_apogee, apogee, 0.0)
+            break
+        
+        if record and t - traj[n - 1, COL_T] >= store_dt:
+            traj, n = _store(traj, n, t, h, v)
+        
+        if t > max_t or h < -10.0:
+            break
+    
+    if not record:
+        n = 0
+    return traj[:n], apogee, time_to_apogee, v_at_2m, t_at_2m
+
+
+@njit(cache=True)
+def _simulate_curve(t_arr, thr_arr, burn_time, m0, mdot, mf, g, rho, drag_k,
+                    rtol, atol, max_step, max_t, store_dt=0.0, record=True):
+    """Kernel per spinta da curva (t_arr, thr_arr), interpolata linearmente"""
+    return _integrate((t_arr, thr_arr), burn_time, m0, mdot, mf, g, rho,
+                      drag_k, rtol, atol, max_step, max_t, store_dt, record)
+
+
+@njit(cache=True)
+def _simulate_const(thrust_value, burn_time, m0, mdot, mf, g, rho, drag_k,
+                    rtol, atol, max_step, max_t, store_dt=0.0, record=True):
+    """Kernel per spinta costante thrust_value fino a burn_time"""
+    return _integrate(thrust_value, burn_time, m0, mdot, mf, g, rho,
+                      drag_k, rtol, atol, max_step, max_t, store_dt, record)
+
+
+@njit(cache=True, parallel=True)
+def _simulate_sweep_core(t_flat, thr_flat, offsets, burn_time, m0, mdot, mf,
+                         g, rho, drag_k, rtol, atol, max_step, max_t):
+    """Simula in parallelo N configurazioni indipendenti.
+    
+    Le curve di spinta delle N configurazioni sono concatenate in
+    t_flat/thr_flat: quella della configurazione i occupa
+    [offsets[i], offsets[i+1]). Restituisce un array (N, 4) con apogeo,
+    tempo all'apogeo, velocità e tempo a 2m.
+    """
+    n = mf.shape[0]
+    out = np.empty((n, 4))
+    for i in prange(n):
+        lo = offsets[i]
+        hi = offsets[i + 1]
+        _, apogee, time_to_apogee, v_at_2m, t_at_2m = _simulate_curve(
+            t_flat[lo:hi], thr_flat[lo:hi], burn_time[i], m0[i], mdot[i],
+            mf[i], g, rho, drag_k[i], rtol, atol, max_step, max_t, 0.0,
+            False)
+        out[i, 0] = apogee
+        out[i, 1] = time_to_apogee
+        out[i, 2] = v_at_2m
+        out[i, 3] = t_at_2m
+    return out
+
+
+@dataclass(frozen=True)
+class _EngineData:
+    """Contenuto di un file .eng già analizzato"""
+    name: str
+    diameter: float         # mm
+    length: float           # mm
+    propellant_mass: float  # kg
+    total_mass: float       # kg
+    time: np.ndarray
+    thrust: np.ndarray
+    burn_time: float
+    total_impulse: float
+
+
+@lru_cache(maxsize=32)
+def _load_engine(path, mtime):
+    """Legge e analizza un file .eng.
+    
+    mtime fa parte della chiave della cache: se il file viene modificato
+    la voce precedente non viene più usata.
+    """
+    # Lettura unica in binario; latin-1 decodifica qualsiasi byte
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        text = raw.decode('latin-1')
+    lines = text.splitlines()
+    
+    # Salta commenti e trova la riga di specifiche
+    name = ""
+    diameter = length = propellant_mass = total_mass = 0
+    data_start = 0
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+        
+        # Riga di specifiche (es: F35 29 95 0-4-6-8 0.090 0.118 TSP)
+        parts = line.split()
+        if len(parts) >= 6:
+            name = parts[0]
+            diameter = float(parts[1])
+            length = float(parts[2])
+            # parts[3] sono i delay disponibili
+            propellant_mass = float(parts[4])
+            total_mass = float(parts[5])
+            data_start = i + 1
+            break
+    
+    # Leggi i dati di spinta (tempo, forza) in un'unica passata: le righe
+    # non valide vengono saltate, il blocco finisce alla riga di specifiche
+    # del motore successivo
+    times = []
+    thrusts = []
+    for line in lines[data_start:]:
+        parts = line.split(';', 1)[0].split()
+        if len(parts) < 2:
+            continue
+        try:
+            t = float(parts[0])
+            f = float(parts[1])
+        except ValueError:
+            if len(parts) >= 6:
+                break
+            continue
+        times.append(t)
+        thrusts.append(f)
+    
+    time = np.array(times, dtype=np.float64)
+    thrust = np.array(thrusts, dtype=np.float64)
+    # Gli array sono condivisi tra tutti i parser dello stesso file
+    time.setflags(write=False)
+    thrust.setflags(write=False)
+    
+    burn_time = float(time[-1]) if len(time) > 0 else 0.0
+    # Integrazione trapezoidale
+    total_impulse = 0.0
+    if len(time) >= 2:
+        total_impulse = float(np.trapezoid(thrust, time))
+    
+    return _EngineData(name, diameter, length, propellant_mass, total_mass,
+                       time, thrust, burn_time, total_impulse)
+
 
 class EngineParser:
     """Parser per file .eng (formato RASP)"""
@@ -14,76 +391,42 @@ class EngineParser:
         self.total_mass = 0
         self.time = []
         self.thrust = []
+        self._burn_time = 0
+        self._total_impulse = 0
         
     def parse(self):
-        """Legge e analizza il file .eng"""
-        encodings = ['utf-8', 'latin-1', 'windows-1252', 'iso-8859-1', 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                with open(self.filepath, 'r', encoding=encoding) as f:
-                    lines = f.readlines()
-            except (UnicodeDecodeError, UnicodeError):
-                continue  # prova il prossimo encoding
-        
-        # Salta commenti e trova la riga di specifiche
-        data_start = 0
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or line.startswith(';'):
-                continue
-            
-            # Riga di specifiche (es: F35 29 95 0-4-6-8 0.090 0.118 TSP)
-            parts = line.split()
-            if len(parts) >= 6:
-                self.name = parts[0]
-                self.diameter = float(parts[1])  # mm
-                self.length = float(parts[2])    # mm
-                # parts[3] sono i delay disponibili
-                self.propellant_mass = float(parts[4])  # kg
-                self.total_mass = float(parts[5])       # kg
-                data_start = i + 1
-                break
+        """Legge e analizza il file .eng (con cache per percorso e mtime)"""
+        path = os.path.abspath(self.filepath)
+        data = _load_engine(path, os.stat(path).st_mtime_ns)
         
-        # Leggi i dati di spinta (tempo, forza)
-        for line in lines[data_start:]:
-            line = line.strip()
-            if not line or line.startswith(';'):
-                continue
-            
-            parts = line.split()
-            if len(parts) >= 2:
-                try:
-                    time = float(parts[0])
-                    thrust = float(parts[1])
-                    self.time.append(time)
-                    self.thrust.append(thrust)
-                except ValueError:
-                    continue
-        
-        self.time = np.array(self.time)
-        self.thrust = np.array(self.thrust)
+        self.name = data.name
+        self.diameter = data.diameter
+        self.length = data.length
+        self.propellant_mass = data.propellant_mass
+        self.total_mass = data.total_mass
+        self.time = data.time
+        self.thrust = data.thrust
+        self._burn_time = data.burn_time
+        self._total_impulse = data.total_impulse
         
         return self
     
     def get_burn_time(self):
         """Restituisce la durata totale della combustione"""
-        return self.time[-1] if len(self.time) > 0 else 0
+        return self._burn_time
     
     def get_average_thrust(self):
-        """Calcola la spinta media"""
+        """Restituisce la spinta media (impulso totale / durata)"""
         if len(self.time) < 2:
             return 0
-        # Integrazione trapezoidale
-        total_impulse = np.trapezoid(self.thrust, self.time)
-        return total_impulse / self.get_burn_time()
+        return self._total_impulse / self._burn_time
     
     def get_thrust_interpolator(self):
         """Crea una funzione di interpolazione per la spinta"""
         if len(self.time) < 2:
             return lambda t: 0
-        return interp1d(self.time, self.thrust, kind='linear', 
-                       bounds_error=False, fill_value=0)
+        time, thrust = self.time, self.thrust
+        return lambda t: np.interp(t, time, thrust, left=0.0, right=0.0)
 
 
 class RocketSimulator:
@@ -106,6 +449,7 @@ class RocketSimulator:
         self.diameter = diameter
         self.cd = cd
         self.area = np.pi * (diameter / 2) ** 2
+        self._drag_k = 0.5 * cd * self.area
         
         # Costanti
         self.g = 9.81
@@ -115,7 +459,8 @@ class RocketSimulator:
         if engine is not None:
             # Usa dati dal file .eng
             self.engine_mode = 'curve'
-            self.thrust_func = engine.get_thrust_interpolator()
+            self._t_arr = np.ascontiguousarray(engine.time, dtype=np.float64)
+            self._thr_arr = np.ascontiguousarray(engine.thrust, dtype=np.float64)
             self.burn_time = engine.get_burn_time()
             self.mp = engine.propellant_mass
             self.m0 = total_mass
@@ -132,83 +477,79 @@ class RocketSimulator:
             self.mf = total_mass - propellant_mass
             self.engine_name = "Custom"
             self.avg_thrust = thrust
+        
+        if not self.burn_time > 0:
+            source = (f" (file '{engine.filepath}')" if engine is not None
+                      else "")
+            raise ValueError(f"Durata di combustione non valida per il motore "
+                             f"'{self.engine_name}'{source}: "
+                             f"{self.burn_time} s, serve un valore > 0")
+        
+        # Portata di massa del propellente (kg/s)
+        self._mdot = self.mp / self.burn_time
     
     def thrust(self, t):
         """Restituisce la spinta al tempo t"""
         if t > self.burn_time:
-            return 0
+            return 0.0
         
         if self.engine_mode == 'curve':
-            return self.thrust_func(t)
+            return float(np.interp(t, self._t_arr, self._thr_arr,
+                                   left=0.0, right=0.0))
         else:
             return self.thrust_value
     
+    def thrust_profile(self, times):
+        """Restituisce la spinta su un array di tempi"""
+        t_arr, thr_arr = self._thrust_curve()
+        return np.where(times <= self.burn_time,
+                        np.interp(times, t_arr, thr_arr, left=0.0, right=0.0),
+                        0.0)
+    
     def drag_force(self, velocity, altitude):
         """Calcola la forza di attrito aerodinamico"""
-        rho_alt = self.rho * np.exp(-altitude / 8500)
-        return 0.5 * rho_alt * velocity**2 * self.cd * self.area
+        rho_alt = self.rho * exp(-altitude * INV_SCALE_HEIGHT)
+        return rho_alt * velocity * abs(velocity) * self._drag_k
     
     def mass(self, t):
         """Calcola la massa istantanea del razzo"""
         if t <= self.burn_time:
-            return self.m0 - (self.mp / self.burn_time) * t
+            return self.m0 - self._mdot * t
         else:
             return self.mf
     
-    def simulate(self, dt=0.001):
-        """Simula il volo del razzo con passo temporale più piccolo per precisione"""
-        t = 0
-        h = 0
-        v = 0
-        
-        times = [t]
-        heights = [h]
-        velocities = [v]
-        thrusts = [self.thrust(t)]
+    def _thrust_curve(self):
+        """Curva di spinta (tempi, spinte) usata dall'integratore"""
+        if self.engine_mode == 'curve':
+            return self._t_arr, self._thr_arr
+        # Spinta costante: curva a due punti su [0, burn_time]
+        return (np.array([0.0, self.burn_time], dtype=np.float64),
+                np.full(2, float(self.thrust_value)))
+    
+    def simulate(self, rtol=1e-6, atol=1e-6, max_step=0.05, store_dt=0.01):
+        """Simula il volo del razzo (Dormand-Prince a passo adattivo)
         
-        v_at_2m = None
-        t_at_2m = None
+        rtol/atol sono le tolleranze relativa e assoluta sull'errore locale,
+        max_step il passo massimo (s); store_dt è la spaziatura minima (s)
+        dei campioni salvati nella traiettoria, indipendente dal passo.
+        """
+        params = (float(self.burn_time), float(self.m0), float(self._mdot),
+                  float(self.mf), self.g, self.rho, float(self._drag_k),
+                  rtol, atol, max_step, MAX_FLIGHT_TIME, store_dt)
         
-        # Fase ascendente
-        while True:
-            m = self.mass(t)
-            
-            thrust_force = self.thrust(t)
-            weight = m * self.g
-            drag = self.drag_force(v, h) if v > 0 else 0
-            
-            a = (thrust_force - weight - drag) / m
-            
-            v += a * dt
-            h += v * dt
-            t += dt
-            
-            times.append(t)
-            heights.append(h)
-            velocities.append(v)
-            thrusts.append(thrust_force)
-            
-            if v_at_2m is None and h >= 2.0:
-                v_at_2m = v
-                t_at_2m = t
-            
-            if v <= 0 and h > 0:
-                apogee = h
-                time_to_apogee = t
-                break
-            
-            if t > 300 or h < -10:
-                break
+        # Kernel specializzato scelto una volta sola in base al motore
+        if self.engine_mode == 'curve':
+            out = _simulate_curve(self._t_arr, self._thr_arr, *params)
+        else:
+            out = _simulate_const(float(self.thrust_value), *params)
+        traj, apogee, time_to_apogee, v_at_2m, t_at_2m = out
         
         return {
             'apogeo': apogee,
             'tempo_apogeo': time_to_apogee,
-            'velocita_2m': v_at_2m if v_at_2m else 0,
-            'tempo_2m': t_at_2m if t_at_2m else 0,
-            'times': times,
-            'heights': heights,
-            'velocities': velocities,
-            'thrusts': thrusts
+            'velocita_2m': v_at_2m,
+            'tempo_2m': t_at_2m,
+            'traj': traj
         }
     
     def print_results(self, results):
@@ -228,12 +569,31 @@ class RocketSimulator:
         print(f"Tempo a 2m:                {results['tempo_2m']:.3f} s")
         print("=" * 60)
     
-    def plot_results(self, results):
-        """Crea grafici dei risultati"""
-        fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 10))
+    def plot_results(self, results, fig=None, path=None):
+        """Crea grafici dei risultati
+        
+        fig: figura da riusare (es. da make_plot_figure), i cui assi vengono
+        ripuliti invece di crearne di nuovi; path: se indicato, la figura
+        viene salvata su file invece di essere mostrata. Una figura non
+        gestita da pyplot (come quella di make_plot_figure) richiede path.
+        """
+        if fig is None and path is not None:
+            # Salvataggio su file: figura fuori da pyplot, nessuna da chiudere
+            fig = make_plot_figure()
+        if fig is None:
+            fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(10, 10))
+        else:
+            if path is None and fig.canvas.manager is None:
+                raise ValueError("La figura non è gestita da pyplot e non può "
+                                 "essere mostrata: indicare path per salvarla")
+            ax1, ax2, ax3 = fig.axes
+            for ax in (ax1, ax2, ax3):
+                ax.cla()
+        traj = results['traj']
+        times = traj[:, COL_T]
         
         # Grafico spinta vs tempo
-        ax1.plot(results['times'], results['thrusts'], 'orange', linewidth=2)
+        ax1.plot(times, self.thrust_profile(times), 'orange', linewidth=2)
         ax1.axvline(x=self.burn_time, color='r', linestyle='--', 
                     label=f"Fine combustione ({self.burn_time:.2f}s)")
         ax1.set_xlabel('Tempo (s)')
@@ -243,7 +603,7 @@ class RocketSimulator:
         ax1.legend()
         
         # Grafico altezza vs tempo
-        ax2.plot(results['times'], results['heights'], 'b-', linewidth=2)
+        ax2.plot(times, traj[:, COL_H], 'b-', linewidth=2)
         ax2.axhline(y=results['apogeo'], color='r', linestyle='--', 
                     label=f"Apogeo: {results['apogeo']:.2f} m")
         ax2.axhline(y=2, color='g', linestyle='--', alpha=0.5, 
@@ -255,7 +615,7 @@ class RocketSimulator:
         ax2.legend()
         
         # Grafico velocità vs tempo
-        ax3.plot(results['times'], results['velocities'], 'r-', linewidth=2)
+        ax3.plot(times, traj[:, COL_V], 'r-', linewidth=2)
         ax3.axhline(y=0, color='k', linestyle='-', alpha=0.3)
         ax3.axvline(x=self.burn_time, color='orange', linestyle='--', 
                     label=f"Fine combustione ({self.burn_time:.2f}s)")
@@ -265,8 +625,175 @@ class RocketSimulator:
         ax3.grid(True, alpha=0.3)
         ax3.legend()
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        if path is not None:
+            fig.savefig(path, dpi=90)
+        else:
+            plt.show()
+
+
+def make_plot_figure():
+    """Crea una figura a 3 grafici, senza backend grafico, per plot_results.
+    
+    Pensata per le simulazioni in serie: la stessa figura viene riusata e
+    salvata su file a ogni chiamata di plot_results(results, fig, path).
+    """
+    fig = Figure(figsize=(10, 10))
+    fig.subplots(3, 1)
+    return fig
+
+
+def simulate_sweep(configs, rtol=1e-6, atol=1e-6, max_step=0.05):
+    """Simula in parallelo più configurazioni razzo/motore.
+    
+    configs: lista di dizionari con gli argomenti di RocketSimulator
+    (es. {'total_mass': 1.0, 'diameter': 0.06, 'cd': 0.9, 'engine': eng}).
+    Restituisce un dizionario di array con un elemento per configurazione.
+    """
+    if len(configs) == 0:
+        empty = np.empty(0)
+        return {
+            'apogeo': empty,
+            'tempo_apogeo': empty.copy(),
+            'velocita_2m': empty.copy(),
+            'tempo_2m': empty.copy()
+        }
+    
+    sims = [RocketSimulator(**config) for config in configs]
+    curves = [sim._thrust_curve() for sim in sims]
+    
+    offsets = np.zeros(len(sims) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(t_arr) for t_arr, _ in curves])
+    t_flat = np.concatenate([t_arr for t_arr, _ in curves])
+    thr_flat = np.concatenate([thr_arr for _, thr_arr in curves])
+    
+    burn_time = np.array([sim.burn_time for sim in sims], dtype=np.float64)
+    m0 = np.array([sim.m0 for sim in sims], dtype=np.float64)
+    mdot = np.array([sim._mdot for sim in sims], dtype=np.float64)
+    mf = np.array([sim.mf for sim in sims], dtype=np.float64)
+    drag_k = np.array([sim._drag_k for sim in sims], dtype=np.float64)
+    
+    out = _simulate_sweep_core(t_flat, thr_flat, offsets, burn_time, m0, mdot,
+                               mf, sims[0].g, sims[0].rho, drag_k, rtol, atol,
+                               max_step, MAX_FLIGHT_TIME)
+    
+    return {
+        'apogeo': out[:, 0],
+        'tempo_apogeo': out[:, 1],
+        'velocita_2m': out[:, 2],
+        'tempo_2m': out[:, 3]
+    }
+
+
+def simulate_batch(configs, dt=0.001, dtype=np.float32):
+    """Simula più configurazioni in parallelo su vettori (Eulero, passo dt).
+    
+    Lo stato (h, v) di tutte le K configurazioni avanza in un unico ciclo
+    con operazioni NumPy su array di forma (K,) del tipo dtype (float32 di
+    default: metà dei byte per passo; sulla configurazione dell'esempio F35
+    l'apogeo differisce da float64 per circa 0.2 mm, su altre
+    configurazioni lo scarto può arrivare a qualche millimetro). dtype può
+    essere un tipo NumPy, un np.dtype o una stringa come 'float32'.
+    
+    Attenzione: è un integratore di Eulero a passo fisso, più lento e meno
+    preciso di simulate_sweep (Dormand-Prince adattivo): per la stessa
+    configurazione l'apogeo può differire di alcuni decimetri. Da usare
+    solo quando servono le traiettorie complete di tutte le configurazioni
+    su una griglia temporale comune; per apogeo e uscita rampa usare
+    simulate_sweep.
+    
+    configs ha lo stesso formato di simulate_sweep. Restituisce apogeo,
+    tempo all'apogeo, velocità e tempo a 2m come array float64 (K,) e le
+    traiettorie 'times' (N,), 'heights' e 'velocities' (N, K) in dtype.
+    """
+    dtype = np.dtype(dtype).type
+    if len(configs) == 0:
+        empty = np.empty(0)
+        return {
+            'apogeo': empty,
+            'tempo_apogeo': empty.copy(),
+            'velocita_2m': empty.copy(),
+            'tempo_2m': empty.copy(),
+            'times': empty.copy(),
+            'heights': np.empty((0, 0), dtype=dtype),
+            'velocities': np.empty((0, 0), dtype=dtype)
+        }
+    
+    sims = [RocketSimulator(**config) for config in configs]
+    k = len(sims)
+    g = dtype(sims[0].g)
+    rho = dtype(sims[0].rho)
+    inv_scale_height = dtype(INV_SCALE_HEIGHT)
+    dt_state = dtype(dt)
+    
+    burn_time = np.array([sim.burn_time for sim in sims], dtype=dtype)
+    m0 = np.array([sim.m0 for sim in sims], dtype=dtype)
+    mdot = np.array([sim._mdot for sim in sims], dtype=dtype)
+    mf = np.array([sim.mf for sim in sims], dtype=dtype)
+    drag_k = np.array([sim._drag_k for sim in sims], dtype=dtype)
+    
+    # Spinta campionata una volta sulla griglia della combustione: (n_burn, K)
+    n_burn = int(burn_time.max() / dt) + 1
+    t_grid = np.arange(n_burn) * dt
+    thr_table = np.column_stack([sim.thrust_profile(t_grid)
+                                 for sim in sims]).astype(dtype)
+    
+    h = np.zeros(k, dtype=dtype)
+    v = np.zeros(k, dtype=dtype)
+    apogee = np.zeros(k)
+    time_to_apogee = np.zeros(k)
+    v_at_2m = np.zeros(k)
+    t_at_2m = np.zeros(k)
+    reached_2m = np.zeros(k, dtype=bool)
+    done = np.zeros(k, dtype=bool)
+    
+    heights = np.empty((4096, k), dtype=dtype)
+    velocities = np.empty((4096, k), dtype=dtype)
+    heights[0] = h
+    velocities[0] = v
+    
+    step = 0
+    while not done.all():
+        t = step * dt
+        thr = thr_table[step] if step < n_burn else dtype(0.0)
+        m = np.where(t <= burn_time, m0 - mdot * dtype(t), mf)
+        drag = rho * np.exp(-h * inv_scale_height) * v * np.abs(v) * drag_k
+        a = (thr - m * g - drag) / m
+        
+        v_prev = v
+        v = np.where(done, v, v + a * dt_state)
+        h = np.where(done, h, h + v * dt_state)
+        step += 1
+        t = step * dt
+        
+        if step == heights.shape[0]:
+            heights = np.concatenate([heights, np.empty_like(heights)])
+            velocities = np.concatenate([velocities, np.empty_like(velocities)])
+        heights[step] = h
+        velocities[step] = v
+        
+        exit_rail = ~reached_2m & (h >= 2.0)
+        v_at_2m[exit_rail] = v[exit_rail]
+        t_at_2m[exit_rail] = t
+        reached_2m |= exit_rail
+        
+        at_apogee = ~done & (v <= 0.0) & (v_prev > 0.0)
+        apogee[at_apogee] = h[at_apogee]
+        time_to_apogee[at_apogee] = t
+        done |= at_apogee | (h < -10.0)
+        
+        if t > MAX_FLIGHT_TIME:
+            break
+    
+    return {
+        'apogeo': apogee,
+        'tempo_apogeo': time_to_apogee,
+        'velocita_2m': v_at_2m,
+        'tempo_2m': t_at_2m,
+        'times': np.arange(step + 1) * dt,
+        'heights': heights[:step + 1],
+        'velocities': velocities[:step + 1]
+    }
 
 
 # ============================================================================
@@ -329,7 +856,7 @@ if __name__ == "__main__":
                              propellant_mass=manual_propellant_mass)
     
     # Esegui la simulazione
-    results = sim.simulate(dt=0.001)
+    results = sim.simulate()
     
     # Stampa i risultati
     sim.print_results(results)